@@ -10,14 +10,15 @@ Simple synthetic CEX–DEX divergence monitor.
 - Flags timesteps where divergence exceeds thresholds
 """
 
+import sys
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime
+from typing import Iterator, Optional, TextIO, Union
 
 import numpy as np
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DivergencePoint:
     ts: datetime
     cex_price: float
@@ -35,67 +36,123 @@ def generate_cex_dex_series(
     distortion_prob: float = 0.08,
     distortion_magnitude_pct: float = 5.0,
 ):
-    start = datetime.utcnow().replace(microsecond=0)
-    cex_prices = []
-    dex_prices = []
-    ts_list = []
-
-    price = base_price
-    for i in range(n_points):
-        price += drift + np.random.normal(0, noise_cex)
-        ts = start + timedelta(seconds=i * 20)
-
-        cex_price = price + np.random.normal(0, noise_cex)
-        dex_price = price + np.random.normal(0, noise_dex)
-
-        # occasional distortion on DEX side to simulate thin-liquidity or manipulation
-        if np.random.rand() < distortion_prob:
-            sign = np.random.choice([-1, 1])
-            dex_price *= 1 + sign * (distortion_magnitude_pct / 100.0)
+    start = np.datetime64(datetime.utcnow().replace(microsecond=0), "s")
+    ts = start + np.arange(n_points, dtype="timedelta64[s]") * 20
+
+    # one RNG draw for the whole series: row 0 drives the shared random walk,
+    # rows 1 and 2 are the per-venue observation noise
+    rng = np.random.default_rng()
+    z = rng.standard_normal((3, n_points))
+    price = base_price + np.cumsum(drift + noise_cex * z[0])
+
+    cex_prices = price + noise_cex * z[1]
+    dex_prices = price + noise_dex * z[2]
+
+    # occasional distortion on DEX side to simulate thin-liquidity or manipulation
+    # (branchless: apply is 0/1 and sign is +/-1, so factor is 1 where not applied)
+    apply = rng.random(n_points) < distortion_prob
+    sign = np.where(rng.random(n_points) < 0.5, -1.0, 1.0)
+    dex_prices *= 1.0 + apply * sign * (distortion_magnitude_pct / 100.0)
+
+    return ts, cex_prices, dex_prices
+
+
+DIVERGENCE_DTYPE = np.dtype(
+    [
+        ("ts", "datetime64[s]"),
+        ("cex", "f8"),
+        ("dex", "f8"),
+        ("dev", "f8"),
+        ("flag", "?"),
+    ]
+)
+
+
+# eq=False: the generated __eq__ / __hash__ would compare or hash the ndarray
+@dataclass(slots=True, frozen=True, eq=False)
+class DivergenceReport:
+    """
+    Divergence results for a whole series, stored as one DIVERGENCE_DTYPE array.
+
+    DivergencePoint objects are only built when a caller indexes or iterates;
+    slicing returns another DivergenceReport over a view of the same array.
+    """
+
+    arr: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.arr)
+
+    def __getitem__(self, i) -> Union[DivergencePoint, "DivergenceReport"]:
+        row = self.arr[i]
+        if isinstance(row, np.ndarray):  # slice, mask or index array
+            return DivergenceReport(row)
+        return DivergencePoint(
+            ts=row["ts"].item(),
+            cex_price=float(row["cex"]),
+            dex_price=float(row["dex"]),
+            deviation_pct=float(row["dev"]),
+            flagged=bool(row["flag"]),
+        )
 
-        cex_prices.append(cex_price)
-        dex_prices.append(dex_price)
-        ts_list.append(ts)
+    def __iter__(self) -> Iterator[DivergencePoint]:
+        for i in range(len(self.arr)):
+            yield self[i]
 
-    return ts_list, np.array(cex_prices), np.array(dex_prices)
+    def num_flagged(self) -> int:
+        return int(self.arr["flag"].sum())
 
 
 def compute_divergence_points(
-    ts_list: List[datetime],
+    ts,
     cex_prices,
     dex_prices,
     warn_threshold_pct: float = 1.5,
-):
-    points: List[DivergencePoint] = []
-    for ts, cp, dp in zip(ts_list, cex_prices, dex_prices):
-        deviation_pct = (dp - cp) / cp * 100.0
-        flagged = abs(deviation_pct) >= warn_threshold_pct
-        points.append(
-            DivergencePoint(
-                ts=ts,
-                cex_price=float(cp),
-                dex_price=float(dp),
-                deviation_pct=float(deviation_pct),
-                flagged=flagged,
-            )
+) -> DivergenceReport:
+    """
+    Compute DEX-vs-CEX deviation for the whole series in one pass.
+
+    Results are stored column-wise in a DivergenceReport (one DIVERGENCE_DTYPE
+    row per timestep) rather than as a list of DivergencePoint objects.
+    """
+    cex = np.asarray(cex_prices, dtype=float)
+    dex = np.asarray(dex_prices, dtype=float)
+    deviation_pct = (dex - cex) / cex * 100.0
+
+    points = np.empty(len(cex), dtype=DIVERGENCE_DTYPE)
+    points["ts"] = np.asarray(ts, dtype="datetime64[s]")
+    points["cex"] = cex
+    points["dex"] = dex
+    points["dev"] = deviation_pct
+    points["flag"] = np.abs(deviation_pct) >= warn_threshold_pct
+    return DivergenceReport(points)
+
+
+def run_monitor(stream: Optional[TextIO] = None):
+    ts, cex_prices, dex_prices = generate_cex_dex_series(n_points=50)
+    report = compute_divergence_points(ts, cex_prices, dex_prices)
+    points = report.arr
+
+    # format from plain Python lists: numpy scalar __format__ is much slower
+    iso = np.datetime_as_string(points["ts"], unit="s").tolist()
+    rows = [
+        f"{ts}  CEX={cp:8.2f}  "
+        f"DEX={dp:8.2f}  dev={dev:6.2f}%  [{'FLAG' if flag else 'OK'}]"
+        for ts, cp, dp, dev, flag in zip(
+            iso,
+            points["cex"].tolist(),
+            points["dex"].tolist(),
+            points["dev"].tolist(),
+            points["flag"].tolist(),
         )
-    return points
-
+    ]
 
-def run_monitor():
-    ts_list, cex_prices, dex_prices = generate_cex_dex_series(n_points=50)
-    points = compute_divergence_points(ts_list, cex_prices, dex_prices)
-
-    print("\n=== CEX–DEX Divergence Monitor (Synthetic) ===\n")
-    for p in points:
-        marker = "FLAG" if p.flagged else "OK"
-        print(
-            f"{p.ts.isoformat()}  CEX={p.cex_price:8.2f}  "
-            f"DEX={p.dex_price:8.2f}  dev={p.deviation_pct:6.2f}%  [{marker}]"
-        )
+    num_flagged = report.num_flagged()
 
-    num_flagged = sum(1 for p in points if p.flagged)
-    print(f"\nFlagged {num_flagged} / {len(points)} points above threshold.\n")
+    out = ["\n=== CEX–DEX Divergence Monitor (Synthetic) ===\n"]
+    out.extend(rows)
+    out.append(f"\nFlagged {num_flagged} / {len(points)} points above threshold.\n")
+    (sys.stdout if stream is None else stream).write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+"""
+flashloan_kernels.py
+
+Numba-compiled batch version of the swap math in flashloan_simulator.py.
+
+- Compiles flashloan_simulator.uniswap_v2_swap as-is, so the formula lives in one place
+- Runs it over arrays of pools / trades in parallel with prange
+- Falls back to plain Python loops when numba is not installed
+
+Kept out of flashloan_simulator.py so the scalar demo does not import numpy or
+numba; flashloan_simulator.uniswap_v2_swap_batch imports this on first use.
+"""
+
+import numpy as np
+
+from flashloan_simulator import uniswap_v2_swap
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to plain Python
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+_swap = njit(cache=True)(uniswap_v2_swap)
+
+
+@njit(cache=True, parallel=True)
+def uniswap_v2_swap_batch(reserves_in, reserves_out, amounts_in, fee_bps):
+    """See flashloan_simulator.uniswap_v2_swap_batch."""
+    n = amounts_in.shape[0]
+    out = np.empty((3, n))
+    for i in prange(n):
+        out[0, i], out[1, i], out[2, i] = _swap(
+            reserves_in[i], reserves_out[i], amounts_in[i], fee_bps
+        )
+    return out
@@ -13,7 +13,12 @@ This script:
 - "repairs" the pool and prints reversion
 """
 
-import math
+import sys
+from typing import Optional, TextIO
+
+# fee_bps is applied as amount_in * (_BPS - fee_bps) against a reserve_in * _BPS
+# denominator (the contracts' 997/1000 form), leaving one division per swap
+_BPS = 10_000.0
 
 
 def uniswap_v2_price(reserve_in: float, reserve_out: float) -> float:
@@ -25,13 +30,13 @@ def uniswap_v2_swap(reserve_in: float, reserve_out: float, amount_in: float, fee
     """
     Perform a Uniswap v2-style swap:
 
-    amount_in_with_fee = amount_in * (1 - fee)
-    amount_out = (amount_in_with_fee * reserve_out) / (reserve_in + amount_in_with_fee)
+    amount_in_with_fee = amount_in * (10_000 - fee_bps)
+    amount_out = (amount_in_with_fee * reserve_out)
+                 / (reserve_in * 10_000 + amount_in_with_fee)
     """
-    fee = fee_bps / 10_000.0
-    amount_in_with_fee = amount_in * (1 - fee)
+    amount_in_with_fee = amount_in * (_BPS - fee_bps)
     numerator = amount_in_with_fee * reserve_out
-    denominator = reserve_in + amount_in_with_fee
+    denominator = reserve_in * _BPS + amount_in_with_fee
     amount_out = numerator / denominator
 
     new_reserve_in = reserve_in + amount_in
@@ -39,45 +44,77 @@ def uniswap_v2_swap(reserve_in: float, reserve_out: float, amount_in: float, fee
     return new_reserve_in, new_reserve_out, amount_out
 
 
-def run_flashloan_demo():
+def uniswap_v2_swap_fused(
+    reserve_in: float, reserve_out: float, amount_in: float, fee_bps=30
+):
+    """
+    uniswap_v2_swap plus the post-swap implied price, in one call.
+
+    Returns (new_reserve_in, new_reserve_out, amount_out, new_price).
+    """
+    new_reserve_in, new_reserve_out, amount_out = uniswap_v2_swap(
+        reserve_in, reserve_out, amount_in, fee_bps
+    )
+    new_price = new_reserve_out / new_reserve_in
+    return new_reserve_in, new_reserve_out, amount_out, new_price
+
+
+def uniswap_v2_swap_batch(reserves_in, reserves_out, amounts_in, fee_bps):
+    """
+    Vectorized uniswap_v2_swap over n independent pools / trades.
+
+    Returns a (3, n) array with rows (new_reserve_in, new_reserve_out, amount_out).
+    Runs the Numba kernel from flashloan_kernels.py (plain Python without Numba);
+    it is imported here so the scalar demo never loads numpy or numba.
+    """
+    from flashloan_kernels import uniswap_v2_swap_batch as batch_kernel
+
+    return batch_kernel(reserves_in, reserves_out, amounts_in, fee_bps)
+
+
+def run_flashloan_demo(stream: Optional[TextIO] = None):
+    out = []
+
     # Start with a relatively thin pool
     reserve_token = 100.0  # token X
     reserve_usd = 200_000.0  # token Y (e.g., stablecoin)
-    print("=== Initial Pool State ===")
-    print(f"Reserves: X={reserve_token:.2f}, Y={reserve_usd:.2f}")
+    out.append("=== Initial Pool State ===")
+    out.append(f"Reserves: X={reserve_token:.2f}, Y={reserve_usd:.2f}")
     initial_price = uniswap_v2_price(reserve_token, reserve_usd)
-    print(f"Initial implied price: 1 X = {initial_price:.2f} Y\n")
+    out.append(f"Initial implied price: 1 X = {initial_price:.2f} Y\n")
 
     # Simulate a large swap (flash-loan style attack)
     flash_amount_in = 40.0  # big chunk relative to reserves
-    print("=== Flash-Loan-Style Swap ===")
-    print(f"Attacker swaps {flash_amount_in:.2f} X into the pool.")
+    out.append("=== Flash-Loan-Style Swap ===")
+    out.append(f"Attacker swaps {flash_amount_in:.2f} X into the pool.")
 
-    new_reserve_x, new_reserve_y, amount_out_y = uniswap_v2_swap(
+    new_reserve_x, new_reserve_y, amount_out_y, new_price = uniswap_v2_swap_fused(
         reserve_token, reserve_usd, flash_amount_in
     )
-    new_price = uniswap_v2_price(new_reserve_x, new_reserve_y)
     price_impact_pct = (new_price - initial_price) / initial_price * 100.0
 
-    print(f"New reserves: X={new_reserve_x:.2f}, Y={new_reserve_y:.2f}")
-    print(f"Attacker received ~{amount_out_y:.2f} Y")
-    print(f"New implied price: 1 X = {new_price:.2f} Y")
-    print(f"Price impact: {price_impact_pct:.2f}%\n")
+    out.append(f"New reserves: X={new_reserve_x:.2f}, Y={new_reserve_y:.2f}")
+    out.append(f"Attacker received ~{amount_out_y:.2f} Y")
+    out.append(f"New implied price: 1 X = {new_price:.2f} Y")
+    out.append(f"Price impact: {price_impact_pct:.2f}%\n")
 
     # Now simulate "reversion" – liquidity restored close to original
-    print("=== Reversion (Liquidity Restored) ===")
+    out.append("=== Reversion (Liquidity Restored) ===")
     restored_reserve_x = 100.0
     restored_reserve_y = 200_000.0
     restored_price = uniswap_v2_price(restored_reserve_x, restored_reserve_y)
     revert_pct = (restored_price - new_price) / new_price * 100.0
 
-    print(f"Restored reserves: X={restored_reserve_x:.2f}, Y={restored_reserve_y:.2f}")
-    print(f"Restored implied price: 1 X = {restored_price:.2f} Y")
-    print(f"Reversion move vs attack price: {revert_pct:.2f}%")
-    print(
+    out.append(
+        f"Restored reserves: X={restored_reserve_x:.2f}, Y={restored_reserve_y:.2f}"
+    )
+    out.append(f"Restored implied price: 1 X = {restored_price:.2f} Y")
+    out.append(f"Reversion move vs attack price: {revert_pct:.2f}%")
+    out.append(
         "\nThis pattern—a sharp jump from thin liquidity followed by quick reversion—"
         "is what anomaly detectors can use to flag flash-loan-like behavior."
     )
+    (sys.stdout if stream is None else stream).write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
@@ -12,15 +12,23 @@ Small standalone demo for oracle anomaly detection:
 """
 
 import math
-import random
+import sys
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import List, Tuple
+from datetime import datetime
+from typing import List, Optional, TextIO, Tuple
 
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class VenuePoint:
     ts: datetime
     venue: str
@@ -28,7 +36,7 @@ class VenuePoint:
     liquidity: float  # arbitrary units
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BenchmarkPoint:
     ts: datetime
     benchmark_price: float
@@ -37,68 +45,71 @@ class BenchmarkPoint:
     flash_loan_flag: bool
 
 
+VENUES = ["CEX_A", "CEX_B", "DEX_POOL"]
+DEX_COL = VENUES.index("DEX_POOL")
+
+# per-venue micro-noise std and (low, high) liquidity bounds, in VENUES order
+VENUE_NOISE_STD = np.array([1.5, 2.0, 3.0])
+VENUE_LIQ_LOW = np.array([800_000.0, 400_000.0, 150_000.0])
+VENUE_LIQ_HIGH = np.array([1_200_000.0, 800_000.0, 350_000.0])
+
+
 def generate_synthetic_series(
     start: datetime,
     n_points: int,
     base_price: float = 2000.0,
     drift_per_step: float = 0.2,
     noise_std: float = 3.0,
-) -> List[VenuePoint]:
-    """Generate a simple synthetic 3-venue time series with one flash-loan-style spike."""
-
-    venues = ["CEX_A", "CEX_B", "DEX_POOL"]
-    results: List[VenuePoint] = []
-
-    price = base_price
-
-    # pick one index range to simulate a flash-loan distortion on DEX_POOL
-    flash_start = int(n_points * 0.55)
-    flash_end = flash_start + 3  # short-lived spike
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Generate a simple synthetic 3-venue time series with one flash-loan-style spike.
 
-    for i in range(n_points):
-        # simple drift + noise
-        price += drift_per_step + random.gauss(0, noise_std)
-        ts = start + timedelta(seconds=i * 10)
+    Returns (ts, prices, liquidity): ts is a datetime64[s] array with 10s steps,
+    prices and liquidity are (n_points, len(VENUES)) arrays, one row per
+    timestamp and one column per venue.
+    """
 
-        for v in venues:
-            p = price
+    rng = np.random.default_rng()
+    start_s = np.datetime64(start.replace(microsecond=0), "s")
+    ts = start_s + np.arange(n_points, dtype="timedelta64[s]") * 10
 
-            # venue-specific micro-noise
-            if v == "CEX_A":
-                p += random.gauss(0, 1.5)
-                liquidity = random.uniform(800_000, 1_200_000)
-            elif v == "CEX_B":
-                p += random.gauss(0, 2.0)
-                liquidity = random.uniform(400_000, 800_000)
-            else:  # DEX_POOL
-                p += random.gauss(0, 3.0)
-                liquidity = random.uniform(150_000, 350_000)
+    # simple drift + noise, shared by all venues
+    price_path = base_price + np.cumsum(
+        drift_per_step + rng.normal(0, noise_std, n_points)
+    )
 
-                # inject flash-loan-style spike on DEX_POOL
-                if flash_start <= i <= flash_end:
-                    p *= 1.12  # big temporary jump
-                    liquidity = random.uniform(30_000, 60_000)  # drained pool
+    # venue-specific micro-noise and liquidity
+    shape = (n_points, len(VENUES))
+    prices = price_path[:, None] + rng.normal(0, VENUE_NOISE_STD, shape)
+    liqs = rng.uniform(VENUE_LIQ_LOW, VENUE_LIQ_HIGH, shape)
 
-            results.append(VenuePoint(ts=ts, venue=v, price=p, liquidity=liquidity))
+    # inject a short-lived flash-loan-style spike on DEX_POOL
+    flash_start = int(n_points * 0.55)
+    flash_end = min(flash_start + 4, n_points)
+    prices[flash_start:flash_end, DEX_COL] *= 1.12  # big temporary jump
+    liqs[flash_start:flash_end, DEX_COL] = rng.uniform(  # drained pool
+        30_000, 60_000, flash_end - flash_start
+    )
 
-    return results
+    return ts, prices, liqs
 
 
 def compute_liquidity_weighted_benchmark(
-    points: List[VenuePoint],
-) -> Tuple[float, float]:
-    """Return (benchmark_price, total_liquidity) for a set of venue points at a given timestamp."""
-
-    prices = np.array([p.price for p in points], dtype=float)
-    liqs = np.array([p.liquidity for p in points], dtype=float)
+    prices: np.ndarray,
+    liqs: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (benchmark_price, total_liquidity) arrays, one entry per timestamp.
 
-    if liqs.sum() <= 0:
-        return float("nan"), 0.0
+    Rows of prices / liqs are timestamps and columns are venues; the benchmark is
+    NaN wherever a row has no positive liquidity.
+    """
 
-    weights = liqs / liqs.sum()
-    benchmark = float((weights * prices).sum())
-    total_liq = float(liqs.sum())
-    return benchmark, total_liq
+    total_liq = liqs.sum(axis=1)
+    weighted = (prices * liqs).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        benchmark = np.where(total_liq > 0, weighted / total_liq, np.nan)
+    return benchmark, np.maximum(total_liq, 0.0)
 
 
 def detect_staleness(
@@ -110,6 +121,33 @@ def detect_staleness(
     return (current_ts - last_update_ts).total_seconds() > max_staleness_seconds
 
 
+def detect_staleness_vec(
+    ts: np.ndarray,
+    benchmarks: np.ndarray,
+    max_staleness_seconds: int = 40,
+) -> np.ndarray:
+    """
+    Vectorized staleness check over a whole series.
+
+    Element i compares ts[i] against the last timestamp before i with a valid
+    (non-NaN) benchmark, or ts[0] if there is none, matching the per-step loop
+    around detect_staleness. All arithmetic is on integer seconds.
+    """
+    seconds = (ts - ts[:1]).astype("timedelta64[s]").astype(np.int64)
+    idx = np.arange(len(seconds))
+    last_valid = np.maximum.accumulate(np.where(np.isnan(benchmarks), 0, idx))
+    last_update = np.concatenate(([0], last_valid[:-1]))[: len(seconds)]
+    return seconds - seconds[last_update] > max_staleness_seconds
+
+
+MIN_LIQUIDITY_HISTORY = 10
+
+# detector settings used by run_demo
+SPIKE_THRESHOLD_PCT = 4.0
+LIQ_WINDOW = 30  # rolling window (in steps) for the thin-liquidity quantile
+LIQ_QUANTILE = 0.2
+
+
 def detect_thin_liquidity(
     total_liquidity: float,
     rolling_liquidity: List[float],
@@ -119,7 +157,7 @@ def detect_thin_liquidity(
     Flag if current liquidity falls below a rolling quantile (e.g. bottom 20%).
     This is a simple adaptive detector.
     """
-    if len(rolling_liquidity) < 10:
+    if len(rolling_liquidity) < MIN_LIQUIDITY_HISTORY:
         return False
 
     q = float(np.quantile(rolling_liquidity, quantile_threshold))
@@ -156,51 +194,113 @@ def detect_flash_loan_pattern(
     return revert_toward_prev
 
 
-def run_demo():
+@njit("Tuple((b1[:], b1[:]))(f8[:], f8[:], f8, i8, f8)", cache=True)
+def scan_anomalies(
+    benchmarks: np.ndarray,
+    liqs: np.ndarray,
+    spike_threshold_pct: float,
+    liq_window: int,
+    quantile_threshold: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Single streaming pass computing (flash_loan_flags, thin_liquidity_flags).
+
+    Element i of the flash-loan mask equals
+    detect_flash_loan_pattern(benchmarks[: i + 1]). The thin-liquidity check is
+    detect_thin_liquidity over the last liq_window values (including the
+    current one), kept in an insertion-sorted buffer so each step is O(liq_window).
+    As there, nothing is flagged until the window holds MIN_LIQUIDITY_HISTORY
+    values, so a liq_window below that never flags. Non-finite liquidity values
+    are never flagged and are left out of the window.
+
+    With Numba installed, benchmarks and liqs must be 1-D float64 arrays (not
+    lists or integer arrays) and liq_window must be an int.
+    """
+    if liq_window < 1:
+        raise ValueError("liq_window must be at least 1")
+
+    n = benchmarks.shape[0]
+    flash = np.zeros(n, dtype=np.bool_)
+    thin = np.zeros(n, dtype=np.bool_)
+
+    ring = np.empty(liq_window)  # last liq_window values in arrival order
+    window = np.empty(liq_window)  # their finite values, sorted ascending
+    m = 0  # number of finite values currently in window
+
+    for i in range(n):
+        x = liqs[i]
+        slot = i % liq_window
+
+        # evict the oldest value once the window is full; only finite values
+        # were inserted, so the search below always finds its match
+        if i >= liq_window:
+            old = ring[slot]
+            if np.isfinite(old):
+                j = 0
+                while window[j] != old:
+                    j += 1
+                for t in range(j, m - 1):
+                    window[t] = window[t + 1]
+                m -= 1
+
+        ring[slot] = x
+        finite = np.isfinite(x)
+        if finite:
+            j = m
+            while j > 0 and window[j - 1] > x:
+                window[j] = window[j - 1]
+                j -= 1
+            window[j] = x
+            m += 1
+
+        if finite and m >= MIN_LIQUIDITY_HISTORY:
+            # linear interpolation between order statistics, as np.quantile does
+            pos = quantile_threshold * (m - 1)
+            lo = int(pos)
+            hi = min(lo + 1, m - 1)
+            q = window[lo] + (pos - lo) * (window[hi] - window[lo])
+            thin[i] = x < q
+
+        if i >= 2:
+            prev_prev = benchmarks[i - 2]
+            prev = benchmarks[i - 1]
+            current = benchmarks[i]
+            jump_pct = (current - prev_prev) / prev_prev * 100.0
+            revert_toward_prev = abs(prev - prev_prev) < abs(current - prev_prev)
+            flash[i] = jump_pct >= spike_threshold_pct and revert_toward_prev
+
+    return flash, thin
+
+
+def run_demo(stream: Optional[TextIO] = None):
     start = datetime.utcnow().replace(microsecond=0)
-    series = generate_synthetic_series(start=start, n_points=60)
-
-    # group by timestamp
-    points_by_ts = {}
-    for p in series:
-        points_by_ts.setdefault(p.ts, []).append(p)
-
-    sorted_ts = sorted(points_by_ts.keys())
-
-    benchmark_history: List[BenchmarkPoint] = []
-    rolling_liq: List[float] = []
-    rolling_benchmarks: List[float] = []
-    last_update_ts = None
-
-    for ts in sorted_ts:
-        venue_points = points_by_ts[ts]
-        benchmark_price, total_liq = compute_liquidity_weighted_benchmark(venue_points)
-
-        if last_update_ts is None:
-            last_update_ts = ts
-
-        staleness_flag = detect_staleness(ts, last_update_ts)
-        rolling_liq.append(total_liq)
-        thin_liq_flag = detect_thin_liquidity(total_liq, rolling_liq)
-
-        rolling_benchmarks.append(benchmark_price)
-        flash_flag = detect_flash_loan_pattern(rolling_benchmarks)
-
-        # Update last_update_ts if we had a valid benchmark
-        if not math.isnan(benchmark_price):
-            last_update_ts = ts
-
-        benchmark_history.append(
-            BenchmarkPoint(
-                ts=ts,
-                benchmark_price=benchmark_price,
-                staleness_flag=staleness_flag,
-                thin_liquidity_flag=thin_liq_flag,
-                flash_loan_flag=flash_flag,
-            )
+    ts, prices, liqs = generate_synthetic_series(start=start, n_points=60)
+
+    # each row is already one timestamp, so all benchmarks come out of one reduction
+    benchmarks, total_liqs = compute_liquidity_weighted_benchmark(prices, liqs)
+    flash_flags, thin_flags = scan_anomalies(
+        benchmarks, total_liqs, SPIKE_THRESHOLD_PCT, LIQ_WINDOW, LIQ_QUANTILE
+    )
+    stale_flags = detect_staleness_vec(ts, benchmarks)
+
+    benchmark_history: List[BenchmarkPoint] = [
+        BenchmarkPoint(
+            ts=t,
+            benchmark_price=benchmark_price,
+            staleness_flag=staleness_flag,
+            thin_liquidity_flag=thin_liq_flag,
+            flash_loan_flag=flash_flag,
+        )
+        for t, benchmark_price, staleness_flag, thin_liq_flag, flash_flag in zip(
+            ts.astype(object).tolist(),
+            benchmarks.tolist(),
+            stale_flags.tolist(),
+            thin_flags.tolist(),
+            flash_flags.tolist(),
         )
+    ]
 
-    print("\n=== Oracle Anomaly Demo: Summary ===\n")
+    out = ["\n=== Oracle Anomaly Demo: Summary ===\n"]
     for bp in benchmark_history:
         flags = []
         if bp.staleness_flag:
@@ -211,11 +311,14 @@ def run_demo():
             flags.append("FLASH_PATTERN")
 
         flag_str = ", ".join(flags) if flags else "-"
-        print(
+        out.append(
             f"{bp.ts.isoformat()}  price={bp.benchmark_price:8.2f}  flags=[{flag_str}]"
         )
 
-    print("\nDone. You can now port this logic into notebooks or hook it into monitoring.\n")
+    out.append(
+        "\nDone. You can now port this logic into notebooks or hook it into monitoring.\n"
+    )
+    (sys.stdout if stream is None else stream).write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
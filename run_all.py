@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+run_all.py
+
+Run all four demos concurrently and print their reports in a fixed order.
+
+- Each demo runs in its own worker thread
+- Each writes into a private io.StringIO buffer, so reports never interleave
+- The main thread prints the buffers in order once every demo has finished
+"""
+
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from cex_dex_divergence_monitor import run_monitor
+from flashloan_simulator import run_flashloan_demo
+from oracle_anomaly_demo import run_demo
+from swap_trace_decoder import run_decoder
+
+DEMOS = [run_monitor, run_demo, run_flashloan_demo, run_decoder]
+
+
+def _capture(demo) -> str:
+    buf = io.StringIO()
+    demo(stream=buf)
+    return buf.getvalue()
+
+
+def run_all():
+    with ThreadPoolExecutor(max_workers=len(DEMOS)) as ex:
+        reports = list(ex.map(_capture, DEMOS))
+    sys.stdout.write("".join(reports))
+
+
+if __name__ == "__main__":
+    run_all()
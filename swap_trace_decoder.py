@@ -11,12 +11,14 @@ Toy "swap trace decoder" for synthetic EVM-like logs.
 In a real setup, these logs would come from web3.py and ABI decoding.
 """
 
-from collections import defaultdict
+import sys
 from dataclasses import dataclass
-from typing import Dict, List
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, List, Optional, TextIO, Tuple
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LogEvent:
     tx_hash: str
     event_type: str  # "SWAP" or "TRANSFER"
@@ -88,42 +90,47 @@ def parse_logs(raw_logs: List[Dict]) -> List[LogEvent]:
     return events
 
 
-def summarize_swaps(events: List[LogEvent]):
+# (pool, token, side) -> total amount, where side is "sold" or "bought"
+SwapSummary = Dict[Tuple[str, str, str], float]
+
+
+def summarize_swaps(events: List[LogEvent]) -> SwapSummary:
     """
     Build a simple per-pool summary of net flows,
     ignoring TRANSFER events for now.
     """
-    summary = defaultdict(lambda: defaultdict(float))
+    summary: SwapSummary = {}
 
     for e in events:
         if e.event_type != "SWAP":
             continue
-        key = e.pool
-        summary[key][f"{e.token_in}_sold"] += e.amount_in
-        summary[key][f"{e.token_out}_bought"] += e.amount_out
+        k = (e.pool, e.token_in, "sold")
+        summary[k] = summary.get(k, 0.0) + e.amount_in
+        k = (e.pool, e.token_out, "bought")
+        summary[k] = summary.get(k, 0.0) + e.amount_out
 
     return summary
 
 
-def run_decoder():
+def run_decoder(stream: Optional[TextIO] = None):
     raw_logs = get_synthetic_logs()
     events = parse_logs(raw_logs)
     summary = summarize_swaps(events)
 
-    print("\n=== Swap Trace Decoder (Synthetic Logs) ===\n")
-    print("Events:")
+    out = ["\n=== Swap Trace Decoder (Synthetic Logs) ===\n", "Events:"]
     for e in events:
-        print(
+        out.append(
             f"{e.tx_hash}  {e.event_type}  pool={e.pool}  "
             f"{e.amount_in} {e.token_in} -> {e.amount_out} {e.token_out}"
         )
 
-    print("\nPer-pool summary (net flows from SWAP events):\n")
-    for pool, stats in summary.items():
-        print(f"{pool}:")
-        for k, v in stats.items():
-            print(f"  {k}: {v:.4f}")
-    print()
+    out.append("\nPer-pool summary (net flows from SWAP events):\n")
+    for pool, keys in groupby(sorted(summary), key=itemgetter(0)):
+        out.append(f"{pool}:")
+        for k in keys:
+            out.append(f"  {k[1]}_{k[2]}: {summary[k]:.4f}")
+    out.append("")
+    (sys.stdout if stream is None else stream).write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":